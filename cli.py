@@ -9,14 +9,16 @@ optionally include short messages, view statistics, and inspect the audit log.
 Responsibilities:
   • Display interactive menus and banners
   • Handle user input and menu navigation
-  • Persist and display game statistics (rounds played, successful matches)
+  • Persist and display game statistics (rounds played, successful matches);
+    writes are atomic and happen on a background thread off the menu loop
   • Provide options for simple bit-only rounds or enhanced rounds with messages
   • Allow viewing of the last N lines of the audit.log
 
 Dependencies:
     from engine import GameEngine
     from crypto2pc import clear, view_audit_log
-    import json, os, time
+    import json, os, queue, atexit, threading
+    orjson (optional, faster stats (de)serialization)
 
 Usage:
     python3 cli.py
@@ -24,32 +26,105 @@ Usage:
 
 import os
 import json
-import time
-from typing import Dict
+import queue
+import atexit
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import orjson
+except ModuleNotFoundError:  # optional accelerator; fall back to stdlib json
+    orjson = None
 from engine import GameEngine
 from crypto2pc import clear, view_audit_log, Color
 
 STATS_FILE = 'stats.json'
 
+_C_WARN = Color.WARNING.value
+
+
+def _dumps(stats: Dict[str, int]) -> bytes:
+    """Serialize stats to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(stats, option=orjson.OPT_INDENT_2)
+    return json.dumps(stats, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _loads(data: bytes) -> Dict[str, int]:
+    """Parse UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def load_stats() -> Dict[str, int]:
     """Load statistics from disk or initialize defaults."""
     if os.path.exists(STATS_FILE):
         try:
-            with open(STATS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(STATS_FILE, 'rb') as f:
+                return _loads(f.read())
         except (IOError, ValueError):
             pass
     return {'played': 0, 'success': 0}
 
 
+def _write_stats(stats: Dict[str, int]) -> None:
+    """Atomically replace the stats file: write a temp file, fsync, rename."""
+    tmp = STATS_FILE + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(_dumps(stats))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, STATS_FILE)
+    except OSError:
+        print(f"{_C_WARN} Warning: could not save stats.")
+
+
+# Pending snapshot for the background writer; a newer snapshot replaces an
+# unwritten one, so bursts of rounds collapse into a single write.
+_stats_queue: "queue.Queue[Optional[Dict[str, int]]]" = queue.Queue(maxsize=1)
+_stats_writer: Optional[threading.Thread] = None
+
+
+def _stats_writer_loop() -> None:
+    while True:
+        stats = _stats_queue.get()
+        if stats is None:
+            return
+        _write_stats(stats)
+
+
 def save_stats(stats: Dict[str, int]) -> None:
-    """Persist statistics to a JSON file."""
+    """Queue a snapshot of statistics to be persisted by a background thread."""
+    global _stats_writer
+    if _stats_writer is None:
+        _stats_writer = threading.Thread(target=_stats_writer_loop, name='stats-writer', daemon=True)
+        _stats_writer.start()
+        atexit.register(flush_stats)
+    snapshot = dict(stats)
+    while True:
+        try:
+            _stats_queue.put_nowait(snapshot)
+            return
+        except queue.Full:
+            try:
+                _stats_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def flush_stats(timeout: float = 1.0) -> None:
+    """Stop the background writer once pending stats are on disk."""
+    global _stats_writer
+    if _stats_writer is None:
+        return
     try:
-        with open(STATS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
-    except IOError:
-        print(f"{Color.WARNING.value} Warning: could not save stats.")
+        _stats_queue.put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    _stats_writer.join(timeout)
+    _stats_writer = None
 
 
 def print_banner() -> None:
@@ -78,60 +153,99 @@ def show_stats(stats: Dict[str, int]) -> None:
     print(f"Win rate      : {rate}")
 
 
+def _record_result(stats: Dict[str, int], result: Dict) -> None:
+    """Update and persist statistics after a round; aborted rounds are not counted."""
+    if result.get('aborted'):
+        return
+    stats['played'] += 1
+    if result.get('bit_result'):
+        stats['success'] += 1
+    save_stats(stats)
+
+
+def _play_bit_round(engine: GameEngine, stats: Dict[str, int]) -> bool:
+    """Play a bit-only round and record the result."""
+    clear()
+    print('--- Bit-Only Round ---')
+    result = engine.play_round(require_message=False)
+    _record_result(stats, result)
+    input('Press Enter to return to menu...')
+    return True
+
+
+def _play_enhanced_round(engine: GameEngine, stats: Dict[str, int]) -> bool:
+    """Play a round with messages, show them, and record the result."""
+    clear()
+    print('--- Enhanced Round (with messages) ---')
+    result = engine.play_round(require_message=True)
+    if result.get('message1'):
+        print(f"Alice said: {result['message1']}")
+    if result.get('message2'):
+        print(f"Bob said: {result['message2']}")
+    _record_result(stats, result)
+    input('Press Enter to return to menu...')
+    return True
+
+
+def _show_statistics(engine: GameEngine, stats: Dict[str, int]) -> bool:
+    """Show the statistics screen."""
+    clear()
+    print('--- Game Statistics ---')
+    show_stats(stats)
+    input('Press Enter to return to menu...')
+    return True
+
+
+def _view_log(engine: GameEngine, stats: Dict[str, int]) -> bool:
+    """Show the last 20 audit log entries."""
+    clear()
+    print('--- Audit Log (last 20 lines) ---')
+    view_audit_log(20)
+    input('Press Enter to return to menu...')
+    return True
+
+
+def _exit(engine: GameEngine, stats: Dict[str, int]) -> bool:
+    """Flush pending stats and end the menu loop."""
+    flush_stats()
+    print('Goodbye! Thanks for playing.')
+    return False
+
+
+#: Menu choice -> handler(engine, stats); a handler returns False to quit.
+#: Every handler takes both arguments so the table has one signature, even
+#: though only the round handlers use `engine` and _view_log/_exit ignore `stats`.
+MENU_HANDLERS: Dict[str, Callable[[GameEngine, Dict[str, int]], bool]] = {
+    '1': _play_bit_round,
+    '2': _play_enhanced_round,
+    '3': _show_statistics,
+    '4': _view_log,
+    '0': _exit,
+}
+
+
 def main() -> None:
     """Main loop to drive the CLI menu and game flow."""
     stats = load_stats()
     engine = GameEngine('Alice', 'Bob')
 
+    redraw = True
     while True:
-        clear()
-        print_banner()
-        print_menu()
-        choice = input('Select an option >>> ').strip()
-
-        if choice == '1':
+        # After an invalid choice the menu is still on screen; just re-prompt.
+        if redraw:
             clear()
-            print('--- Bit-Only Round ---')
-            result = engine.play_round(require_message=False)
-            stats['played'] += 1
-            if result.get('bit_result'):
-                stats['success'] += 1
-            save_stats(stats)
-            input('Press Enter to return to menu...')
-
-        elif choice == '2':
-            clear()
-            print('--- Enhanced Round (with messages) ---')
-            result = engine.play_round(require_message=True)
-            stats['played'] += 1
-            if result.get('bit_result'):
-                stats['success'] += 1
-            if result.get('message1'):
-                print(f"Alice said: {result['message1']}")
-            if result.get('message2'):
-                print(f"Bob said: {result['message2']}")
-            save_stats(stats)
-            input('Press Enter to return to menu...')
-
-        elif choice == '3':
-            clear()
-            print('--- Game Statistics ---')
-            show_stats(stats)
-            input('Press Enter to return to menu...')
-
-        elif choice == '4':
-            clear()
-            print('--- Audit Log (last 20 lines) ---')
-            view_audit_log(20)
-            input('Press Enter to return to menu...')
+            print_banner()
+            print_menu()
+        choice = input('Select an option >>> ').strip()
 
-        elif choice == '0':
-            print('Goodbye! Thanks for playing.')
+        handler = MENU_HANDLERS.get(choice)
+        if handler is None:
+            print(f"{_C_WARN} Invalid selection. Please choose from the menu.")
+            redraw = False
+            continue
+        if not handler(engine, stats):
             break
-
-        else:
-            print(f"{Color.WARNING.value} Invalid selection. Please choose from the menu.")
-            time.sleep(1)
+        redraw = True
 
 
 if __name__ == '__main__':
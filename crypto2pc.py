@@ -7,16 +7,24 @@ as well as terminal utilities and audit logging for secure two-party computation
 It also provides support for committing arbitrary text messages to increase flexibility.
 
 Responsibilities:
-  • commit_bit(bit): produce a hex-encoded SHA-256 commitment of a single bit (0 or 1) concatenated with a random salt.
-  • verify_bit(commitment, bit, salt_hex): verify a revealed bit and salt against the original commitment.
+  • commit_bit(bit): produce a SHA-256 commitment of a single bit (0 or 1) concatenated with a random salt.
+  • verify_bit(commitment, bit, salt): verify a revealed bit and salt against the original commitment.
+  • verify_bits_batch(commitments, bits, salts): verify many bit reveals at once (audit/replay).
   • commit_message(message): produce a SHA-256 commitment of an arbitrary UTF-8 string with random salt.
-  • verify_message(commitment, message, salt_hex): verify a revealed message and salt against its commitment.
-  • clear(): clear the terminal screen cross-platform to hide sensitive input.
-  • Color: ANSI-colored block constants for green, purple, and warnings.
-  • Audit logging: record each commit and verify event in "audit.log" for security auditing.
+  • verify_message(commitment, message, salt): verify a revealed message and salt against its commitment.
+  • commit_combined(bit, message) / verify_combined(commitment, bit, message, salt): one commitment
+    covering a bit and a message, so a reveal costs a single hash.
+  • clear(): clear the terminal screen cross-platform (ANSI escape, no subprocess) to hide sensitive input.
+  • Color: ANSI-colored block constants for green, purple, and warnings (Color.X.bytes is pre-encoded).
+  • Audit logging: record each commit and verify event in "audit.log" for security auditing;
+    records are written by a background thread through a 64 KiB buffer, flushed at exit,
+    on integrity failures, and before the log is viewed.
   • view_audit_log(lines): display the last N entries from the audit log.
 
-Dependencies: hashlib, secrets, os, platform, logging, enum
+Digests and salts are raw bytes, compared in constant time via hmac.compare_digest; hex
+encoding happens only when a log record is written or a value is displayed.
+
+Dependencies: hashlib, hmac, os, sys, platform, logging, queue, atexit, threading, enum, functools
 
 Usage example:
     from crypto2pc import (
@@ -25,8 +33,9 @@ Usage example:
         clear, Color, IntegrityError, view_audit_log
     )
 
-    # Commit a choice bit
+    # Commit a choice bit; digest (32 bytes) and salt (16 bytes) are raw bytes
     digest, salt = commit_bit(1)
+    print(digest.hex())  # hex-encode only for display
 
     # Reveal and verify the choice bit
     try:
@@ -34,7 +43,7 @@ Usage example:
     except IntegrityError:
         print("Integrity check failed for bit commitment.")
 
-    # Commit a message
+    # Commit a message (raw bytes again)
     msg_digest, msg_salt = commit_message("I love you")
 
     # Reveal and verify the message
@@ -52,107 +61,463 @@ Usage example:
 """
 
 import hashlib
-import secrets
+import hmac
 import os
+import sys
 import platform
 import logging
+import queue
+import atexit
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from enum import Enum
+from functools import cached_property
 
 # ---------- Configuration ----------
 #: Number of random bytes to use as salt in commitments
 SALT_LENGTH = 16
+#: Length in bytes of a raw SHA-256 commitment
+DIGEST_LENGTH = 32
+#: User-space buffer for audit.log; many records are combined into one write()
+AUDIT_BUFFER_SIZE = 64 * 1024
+#: Block size used when reading audit.log backwards from the end
+AUDIT_READ_BLOCK = 8192
+#: Bytes drawn from the OS CSPRNG per refill of the salt pool
+SALT_POOL_SIZE = 4096
+#: Upper bound (seconds) an integrity failure waits for its record to reach disk
+AUDIT_FLUSH_TIMEOUT = 1.0
+
+# ---------- SHA-256 State ----------
+# hashlib's OpenSSL backend already selects SHA-NI compression where available.
+#: Hash states pre-seeded with the single-byte bit prefix; .copy() is a memcpy
+#: of the internal state, far cheaper than a fresh context for tiny inputs.
+_PREFIX = (hashlib.sha256(b'\x00'), hashlib.sha256(b'\x01'))
+#: Empty hash state reused via .copy() for message commitments.
+_EMPTY = hashlib.sha256()
 
 # ---------- Audit Logging Setup ----------
+class _BufferedFileHandler(logging.Handler):
+    """
+    Append-only file handler backed by a fixed-size user-space buffer.
+
+    Unlike logging.FileHandler it never flushes per record; data reaches the
+    file when the buffer fills, or on an explicit flush() (exit, integrity
+    failure, or before the log is read back).
+    """
+    def __init__(self, filename: str, buffer_size: int = AUDIT_BUFFER_SIZE):
+        super().__init__()
+        self.stream = open(filename, 'ab', buffering=buffer_size)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write((self.format(record) + '\n').encode('utf-8'))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.stream.closed:
+                self.stream.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.stream.close()
+            finally:
+                super().close()
+
+
+# Callers only enqueue records; a background listener thread owns the file
+# and performs the writes, keeping the blocking write() off the hot path.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler('audit.log', encoding='utf-8')
+file_handler = _BufferedFileHandler('audit.log')
 formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+
+class _FlushMarker:
+    """Queue item asking the listener to flush the file and signal `done`."""
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _AuditListener(QueueListener):
+    """QueueListener that also services _FlushMarker requests in queue order."""
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushMarker):
+            try:
+                file_handler.flush()
+            finally:
+                record.done.set()
+            return
+        super().handle(record)
+
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = _AuditListener(_log_queue, file_handler)
+_log_listener.start()
+#: Guards _audit_closed so no flush request is queued behind the stop sentinel
+_audit_lock = threading.Lock()
+_audit_closed = False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted, so message interpolation
+    (including hex-encoding digests) runs on the listener thread. Safe because
+    the queue never leaves this process and log arguments are immutable.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            return super().prepare(record)
+        return record
+
+
+logger.addHandler(_DeferredQueueHandler(_log_queue))
+
+
+def _audit(level: int, msg: str, *args) -> None:
+    """
+    Log an audit event without the caller-frame lookup Logger._log performs
+    (the format never uses file/line), which is the single largest cost
+    of a commit or verify call.
+    """
+    if logger.isEnabledFor(level):
+        logger.handle(logger.makeRecord(logger.name, level, '(audit)', 0, msg, args, None))
+
+
+class _Hex:
+    """Log argument that hex-encodes raw bytes only when a record is formatted."""
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __str__(self) -> str:
+        return self.data.hex()
+
+
+def _flush_audit_log(timeout: float | None = None) -> bool:
+    """
+    Wait until every audit record queued so far, and the write buffer,
+    has reached disk. The listener keeps running; a no-op after shutdown.
+    Returns False if `timeout` expired first.
+    """
+    marker = _FlushMarker()
+    with _audit_lock:
+        if _audit_closed:
+            return True
+        _log_queue.put_nowait(marker)
+    return marker.done.wait(timeout)
+
+
+@atexit.register
+def _close_audit_log() -> None:
+    global _audit_closed
+    with _audit_lock:
+        if _audit_closed:
+            return
+        _audit_closed = True
+    _log_listener.stop()
+    file_handler.close()
+
+# ---------- Salt Pool ----------
+class _SaltPool:
+    """
+    Per-thread buffer of OS CSPRNG output handed out in salt-sized slices,
+    so one os.urandom() call serves SALT_POOL_SIZE // SALT_LENGTH commitments.
+    Every byte is handed out at most once.
+    """
+    __slots__ = ('buf', 'off')
+
+    def __init__(self):
+        self.buf = b''
+        self.off = 0
+
+    def get(self, n: int) -> bytes:
+        off = self.off
+        if off + n > len(self.buf):
+            self.buf = os.urandom(max(SALT_POOL_SIZE, n))
+            off = 0
+        self.off = off + n
+        return self.buf[off:off + n]
+
+
+_salt_local = threading.local()
+
+
+def _salt(n: int = SALT_LENGTH) -> bytes:
+    """Return `n` fresh random bytes from the calling thread's salt pool."""
+    pool = getattr(_salt_local, 'pool', None)
+    if pool is None:
+        pool = _salt_local.pool = _SaltPool()
+    return pool.get(n)
+
+
+def _reset_salt_pools() -> None:
+    # A forked child must never reuse salts buffered by its parent.
+    global _salt_local
+    _salt_local = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_salt_pools)
 
 # ---------- Custom Exception ----------
 class IntegrityError(Exception):
     """Raised when a reveal does not match its original commitment."""
     pass
 
+
+def _integrity_failure(reason: str, msg: str, *args) -> IntegrityError:
+    """
+    Log an integrity warning, give it a bounded wait to reach disk, and
+    return the IntegrityError for the caller to raise. Flushing never
+    replaces the exception: a slow disk only shortens the wait.
+    """
+    _audit(logging.WARNING, msg, *args)
+    _flush_audit_log(AUDIT_FLUSH_TIMEOUT)
+    return IntegrityError(reason)
+
+
+def _reveal_problem(commitment: object, salt: object) -> str | None:
+    """
+    Return why a revealed (commitment, salt) pair is malformed, or None.
+    Catches callers still passing hex strings from the old API. Only
+    immutable bytes are accepted, since they are passed to deferred logging.
+    """
+    if not isinstance(commitment, bytes) or len(commitment) != DIGEST_LENGTH:
+        return 'Invalid commitment'
+    if not isinstance(salt, bytes) or len(salt) != SALT_LENGTH:
+        return 'Invalid salt'
+    return None
+
 # ---------- Commit-Reveal for a Single Bit ----------
 
-def commit_bit(bit: int) -> tuple[str, str]:
+def commit_bit(bit: int) -> tuple[bytes, bytes]:
     """
     Commit a single bit (0 or 1) with a random salt.
 
     Returns:
-        commitment: hex-encoded SHA-256 digest of (bit || salt)
-        salt_hex:   hex-encoded random salt
+        commitment: raw SHA-256 digest of (bit || salt)
+        salt:       raw random salt
     """
     if bit not in (0, 1):
         raise ValueError('commit_bit: bit must be 0 or 1')
-    salt = secrets.token_bytes(SALT_LENGTH)
-    digest = hashlib.sha256(bytes([bit]) + salt).hexdigest()
-    logger.info(f'commit_bit: bit={bit}, digest={digest}')
-    return digest, salt.hex()
+    salt = _salt()
+    h = _PREFIX[bit].copy()
+    h.update(salt)
+    digest = h.digest()
+    _audit(logging.INFO, 'commit_bit: bit=%s, digest=%s', bit, _Hex(digest))
+    return digest, salt
 
 
-def verify_bit(commitment: str, bit: int, salt_hex: str) -> None:
+def verify_bit(commitment: bytes, bit: int, salt: bytes) -> None:
     """
     Verify a revealed bit and salt against the original commitment.
 
     Raises:
-        IntegrityError: if recomputed digest does not match commitment.
+        IntegrityError: if recomputed digest does not match commitment, or if
+            commitment/salt are not raw bytes of the expected length.
     """
-    try:
-        salt = bytes.fromhex(salt_hex)
-    except ValueError:
-        logger.warning(f'verify_bit: invalid salt hex: {salt_hex}')
-        raise IntegrityError('Invalid salt hex')
-    digest = hashlib.sha256(bytes([bit]) + salt).hexdigest()
-    if digest != commitment:
-        logger.warning(f'verify_bit mismatch: computed={digest}, expected={commitment}, bit={bit}')
-        raise IntegrityError('Bit commitment mismatch')
-    logger.info(f'verify_bit: bit={bit}, commitment OK')
+    problem = _reveal_problem(commitment, salt)
+    if problem:
+        raise _integrity_failure(problem, 'verify_bit: %s (commitment type=%s, salt type=%s)',
+                                 problem.lower(), type(commitment).__name__, type(salt).__name__)
+    if bit not in (0, 1):
+        raise _integrity_failure('Invalid bit', 'verify_bit: invalid bit: %s', bit)
+    h = _PREFIX[bit].copy()
+    h.update(salt)
+    digest = h.digest()
+    if not hmac.compare_digest(digest, commitment):
+        raise _integrity_failure('Bit commitment mismatch',
+                                 'verify_bit mismatch: computed=%s, expected=%s, bit=%s',
+                                 _Hex(digest), _Hex(commitment), bit)
+    _audit(logging.INFO, 'verify_bit: bit=%s, commitment OK', bit)
+
+
+def verify_bits_batch(commitments: list[bytes], bits: list[int], salts: list[bytes]) -> list[bool]:
+    """
+    Verify many revealed bits against their commitments in one pass,
+    e.g. when replaying or auditing a batch of rounds.
+
+    The per-item cost is a state copy, one update and one compare; an
+    out-of-range bit or a commitment/salt of the wrong length counts as a
+    failure.
+
+    Returns:
+        A list of booleans, True where the reveal matches its commitment.
+
+    Raises:
+        ValueError: if the input lists differ in length.
+        TypeError:  if any commitment or salt is not `bytes` (e.g. hex strings
+                    or array rows), rather than reporting every item as forged.
+    """
+    if not len(commitments) == len(bits) == len(salts):
+        raise ValueError('verify_bits_batch: input lengths differ')
+    for i, (commitment, salt) in enumerate(zip(commitments, salts)):
+        if not (isinstance(commitment, bytes) and isinstance(salt, bytes)):
+            raise TypeError(f'verify_bits_batch: item {i}: commitment and salt must be bytes, '
+                            f'got {type(commitment).__name__} and {type(salt).__name__}')
+    prefix = _PREFIX
+    results = []
+    append = results.append
+    for commitment, bit, salt in zip(commitments, bits, salts):
+        if bit not in (0, 1) or _reveal_problem(commitment, salt):
+            append(False)
+            continue
+        h = prefix[bit].copy()
+        h.update(salt)
+        append(hmac.compare_digest(h.digest(), commitment))
+    failed = results.count(False)
+    if failed:
+        _audit(logging.WARNING, 'verify_bits_batch: %s/%s commitments failed', failed, len(results))
+    else:
+        _audit(logging.INFO, 'verify_bits_batch: %s commitments OK', len(results))
+    return results
 
 # ---------- Commit-Reveal for an Arbitrary Message ----------
 
-def commit_message(message: str) -> tuple[str, str]:
+def commit_message(message: str) -> tuple[bytes, bytes]:
     """
     Commit an arbitrary UTF-8 string with a random salt.
 
     Returns:
-        commitment: hex-encoded SHA-256 digest of (message_bytes || salt)
-        salt_hex:   hex-encoded random salt
+        commitment: raw SHA-256 digest of (message_bytes || salt)
+        salt:       raw random salt
     """
     data = message.encode('utf-8')
-    salt = secrets.token_bytes(SALT_LENGTH)
-    digest = hashlib.sha256(data + salt).hexdigest()
-    logger.info(f'commit_message: message="{message[:10]}...", digest={digest}')
-    return digest, salt.hex()
+    salt = _salt()
+    h = _EMPTY.copy()
+    h.update(data)
+    h.update(salt)
+    digest = h.digest()
+    _audit(logging.INFO, 'commit_message: message="%s...", digest=%s', message[:10], _Hex(digest))
+    return digest, salt
 
 
-def verify_message(commitment: str, message: str, salt_hex: str) -> None:
+def verify_message(commitment: bytes, message: str, salt: bytes) -> None:
     """
     Verify a revealed message and salt against the original commitment.
 
     Raises:
-        IntegrityError: if recomputed digest does not match commitment.
+        IntegrityError: if recomputed digest does not match commitment, or if
+            commitment/salt are not raw bytes of the expected length.
     """
+    problem = _reveal_problem(commitment, salt)
+    if problem:
+        raise _integrity_failure(problem, 'verify_message: %s (commitment type=%s, salt type=%s)',
+                                 problem.lower(), type(commitment).__name__, type(salt).__name__)
     data = message.encode('utf-8')
-    try:
-        salt = bytes.fromhex(salt_hex)
-    except ValueError:
-        logger.warning(f'verify_message: invalid salt hex: {salt_hex}')
-        raise IntegrityError('Invalid salt hex')
-    digest = hashlib.sha256(data + salt).hexdigest()
-    if digest != commitment:
-        logger.warning(f'verify_message mismatch: computed={digest}, expected={commitment}, message="{message[:10]}..."')
-        raise IntegrityError('Message commitment mismatch')
-    logger.info(f'verify_message: message verified, commitment OK')
+    h = _EMPTY.copy()
+    h.update(data)
+    h.update(salt)
+    digest = h.digest()
+    if not hmac.compare_digest(digest, commitment):
+        raise _integrity_failure('Message commitment mismatch',
+                                 'verify_message mismatch: computed=%s, expected=%s, message="%s..."',
+                                 _Hex(digest), _Hex(commitment), message[:10])
+    _audit(logging.INFO, 'verify_message: message verified, commitment OK')
+
+# ---------- Combined Bit + Message Commitment ----------
+
+def _combined_digest(bit: int, data: bytes, salt: bytes) -> bytes:
+    # bit || len(message) as 8-byte big-endian || message || salt
+    h = _PREFIX[bit].copy()
+    h.update(len(data).to_bytes(8, 'big'))
+    h.update(data)
+    h.update(salt)
+    return h.digest()
+
+
+def commit_combined(bit: int, message: str) -> tuple[bytes, bytes]:
+    """
+    Commit a bit and a UTF-8 message together under one salt, so the
+    pair is revealed and verified with a single SHA-256.
+
+    Returns:
+        commitment: raw SHA-256 digest of (bit || len(message_bytes) || message_bytes || salt)
+        salt:       raw random salt
+    """
+    if bit not in (0, 1):
+        raise ValueError('commit_combined: bit must be 0 or 1')
+    salt = _salt()
+    digest = _combined_digest(bit, message.encode('utf-8'), salt)
+    _audit(logging.INFO, 'commit_combined: bit=%s, message="%s...", digest=%s', bit, message[:10], _Hex(digest))
+    return digest, salt
+
+
+def verify_combined(commitment: bytes, bit: int, message: str, salt: bytes) -> None:
+    """
+    Verify a revealed bit, message and salt against a combined commitment.
+
+    Raises:
+        IntegrityError: if recomputed digest does not match commitment, or if
+            commitment/salt are not raw bytes of the expected length.
+    """
+    problem = _reveal_problem(commitment, salt)
+    if problem:
+        raise _integrity_failure(problem, 'verify_combined: %s (commitment type=%s, salt type=%s)',
+                                 problem.lower(), type(commitment).__name__, type(salt).__name__)
+    if bit not in (0, 1):
+        raise _integrity_failure('Invalid bit', 'verify_combined: invalid bit: %s', bit)
+    digest = _combined_digest(bit, message.encode('utf-8'), salt)
+    if not hmac.compare_digest(digest, commitment):
+        raise _integrity_failure('Combined commitment mismatch',
+                                 'verify_combined mismatch: computed=%s, expected=%s, bit=%s, message="%s..."',
+                                 _Hex(digest), _Hex(commitment), bit, message[:10])
+    _audit(logging.INFO, 'verify_combined: bit=%s, message verified, commitment OK', bit)
 
 # ---------- Terminal Utility ----------
 
-def clear() -> None:
-    """Clear the terminal screen, cross-platform."""
-    cmd = 'cls' if platform.system() == 'Windows' else 'clear'
-    os.system(cmd)
+def _stdout_is_tty() -> bool:
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _enable_vt_mode() -> bool:
+    """
+    Return True if stdout is a terminal that interprets ANSI escape sequences.
+    On POSIX this requires a TERM other than unset/empty/'dumb'; on Windows
+    it switches on ENABLE_VIRTUAL_TERMINAL_PROCESSING first.
+    """
+    if not _stdout_is_tty():
+        return False
+    if platform.system() != 'Windows':
+        return os.environ.get('TERM') not in (None, '', 'dumb')
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_ulong()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
+
+
+#: Probed once at import so clear() never branches or spawns a shell
+_VT_ENABLED = _enable_vt_mode()
+
+if _VT_ENABLED:
+    def clear() -> None:
+        """Clear the terminal screen, cross-platform."""
+        # Home, erase screen, erase scrollback (E3) so earlier input is not recoverable
+        sys.stdout.write('\x1b[H\x1b[2J\x1b[3J')
+        sys.stdout.flush()
+elif platform.system() == 'Windows' and _stdout_is_tty():
+    def clear() -> None:
+        """Clear the terminal screen, cross-platform."""
+        os.system('cls')
+else:
+    def clear() -> None:
+        """No-op: stdout is not a terminal that can be cleared."""
 
 # ---------- ANSI Color Blocks ----------
 class Color(Enum):
@@ -161,24 +526,44 @@ class Color(Enum):
     PURPLE  = '\033[95m██\033[0m'  # purple block
     WARNING = '\033[93m!!\033[0m'  # yellow warning
 
+    @cached_property
+    def bytes(self) -> bytes:
+        """UTF-8 encoded value plus newline, for direct writes to sys.stdout.buffer."""
+        return self.value.encode('utf-8') + b'\n'
+
 # ---------- Audit Log Viewer ----------
 
 def view_audit_log(lines: int = 20) -> None:
     """
     Print the last `lines` entries from the audit log.
     """
+    _flush_audit_log()
     try:
-        with open('audit.log', 'r', encoding='utf-8') as f:
-            entries = f.readlines()
+        with open('audit.log', 'rb') as f:
+            # Read fixed-size blocks backwards from EOF until enough line
+            # breaks are buffered, so cost scales with `lines`, not file size.
+            pos = f.seek(0, os.SEEK_END)
+            buf = bytearray()
+            newlines = 0
+            while pos > 0 and newlines <= lines:
+                step = min(AUDIT_READ_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                block = f.read(step)
+                newlines += block.count(b'\n')
+                buf[:0] = block
     except FileNotFoundError:
         print('No audit log found.')
         return
-    for entry in entries[-lines:]:
-        print(entry.rstrip())
+    if lines <= 0:
+        return
+    for entry in bytes(buf).splitlines()[-lines:]:
+        print(entry.decode('utf-8', errors='replace').rstrip())
 
 # ---------- Module Exports ----------
 __all__ = [
-    'commit_bit', 'verify_bit',
+    'commit_bit', 'verify_bit', 'verify_bits_batch',
     'commit_message', 'verify_message',
+    'commit_combined', 'verify_combined',
     'clear', 'IntegrityError', 'Color', 'view_audit_log'
 ]
@@ -5,9 +5,10 @@ engine.py — Protocol Engine for Secure Two-Party Commit-Reveal
 This module builds on crypto2pc.py to implement an interactive engine
 that orchestrates multi-phase commit-reveal rounds for both a single-bit
 choice and an optional short text message. It provides:
-  • Player: encapsulates per-player state (name, commits, salts).
-  • RoundContext: handles commit and reveal phases with timing
-    safeguards and optional message commitments.
+  • Player: encapsulates per-player state (name, commitment, salt).
+  • RoundContext: handles commit and reveal phases with input
+    timeouts; in message rounds the bit and message share one
+    combined commitment, so each reveal is a single hash.
   • GameEngine: high-level API to play rounds, enforce timeouts,
     and display results with ANSI colors.
 
@@ -15,9 +16,10 @@ Dependencies:
     from crypto2pc import (
         commit_bit, verify_bit,
         commit_message, verify_message,
-        clear, Color, IntegrityError, view_audit_log
+        commit_combined, verify_combined,
+        clear, Color, IntegrityError
     )
-    import time, threading
+    import sys, time, select (msvcrt on Windows)
 
 Usage example:
     engine = GameEngine('Alice', 'Bob')
@@ -25,125 +27,210 @@ Usage example:
     # result is a dict: {'bit_result': bool, 'message': str or None}
 """
 
+import sys
 import time
-import threading
+import select
 from typing import Optional, Dict, Tuple
 from crypto2pc import (
     commit_bit, verify_bit,
     commit_message, verify_message,
+    commit_combined, verify_combined,
     clear, Color, IntegrityError
 )
 
+_C_WARN = Color.WARNING.value
+# Result lines pre-encoded for a direct write to sys.stdout.buffer
+_RESULT_GREEN = b'Result block: ' + Color.GREEN.bytes
+_RESULT_PURPLE = b'Result block: ' + Color.PURPLE.bytes
+
+try:
+    import msvcrt
+except ImportError:  # POSIX: stdin can be waited on with select()
+    msvcrt = None
+
 # ---------- Player Class ----------
 class Player:
     """
     Represents one participant in the 2PC protocol.
     Attributes:
       name         (str)
-      bit_commit   (str) and bit_salt (str)
-      msg_commit   (str) and msg_salt (str)
+      commitment   (bytes) and salt (bytes): one commitment covering the bit
+                   and, when committed via commit_choice(bit, message), the
+                   message as well
       selected_bit (int)
       selected_msg (Optional[str])
+      bit_commit / bit_salt: aliases of commitment / salt (pre-combined API)
+      msg_commit / msg_salt: separate message commitment, only set by the
+                   legacy commit_message()
+    Instances are reused across rounds; call reset() before each round.
     """
+    __slots__ = ('name', 'selected_bit', 'selected_msg', 'commitment', 'salt',
+                 'msg_commit', 'msg_salt')
+
     def __init__(self, name: str):
         self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all per-round state, keeping the player's name."""
         self.selected_bit: Optional[int] = None
-        self.bit_commit: Optional[str] = None
-        self.bit_salt: Optional[str] = None
         self.selected_msg: Optional[str] = None
-        self.msg_commit: Optional[str] = None
-        self.msg_salt: Optional[str] = None
+        self.commitment: Optional[bytes] = None
+        self.salt: Optional[bytes] = None
+        self.msg_commit: Optional[bytes] = None
+        self.msg_salt: Optional[bytes] = None
+
+    @property
+    def bit_commit(self) -> Optional[bytes]:
+        return self.commitment
+
+    @bit_commit.setter
+    def bit_commit(self, value: Optional[bytes]) -> None:
+        self.commitment = value
 
-    def commit_choice(self, bit: int) -> None:
-        """Commit a single-bit choice."""
-        digest, salt = commit_bit(bit)
+    @property
+    def bit_salt(self) -> Optional[bytes]:
+        return self.salt
+
+    @bit_salt.setter
+    def bit_salt(self, value: Optional[bytes]) -> None:
+        self.salt = value
+
+    @property
+    def has_combined_commitment(self) -> bool:
+        """True if `commitment` covers the message as well as the bit."""
+        return self.selected_msg is not None and self.msg_commit is None
+
+    def commit_choice(self, bit: int, message: Optional[str] = None) -> None:
+        """
+        Commit a single-bit choice, or the bit together with a text message
+        under a single combined commitment. A bit-only commit leaves a message
+        committed separately via commit_message() in place.
+        """
+        if message is None:
+            digest, salt = commit_bit(bit)
+            if self.has_combined_commitment:
+                # The message was covered by the commitment being replaced
+                self.selected_msg = None
+        else:
+            digest, salt = commit_combined(bit, message)
+            self.selected_msg = message
+            self.msg_commit = None
+            self.msg_salt = None
         self.selected_bit = bit
-        self.bit_commit = digest
-        self.bit_salt = salt
-        print(f"[{self.name}] bit committed: {digest[:8]}...")
+        self.commitment = digest
+        self.salt = salt
+        print(f"[{self.name}] {'bit' if message is None else 'bit and message'} committed: {digest[:4].hex()}...")
 
     def commit_message(self, message: str) -> None:
-        """Optionally commit a text message."""
+        """Commit a text message separately from the bit (pre-combined API)."""
         digest, salt = commit_message(message)
         self.selected_msg = message
         self.msg_commit = digest
         self.msg_salt = salt
         print(f"[{self.name}] message committed.")
 
-    def reveal_choice(self) -> Tuple[int, str]:
+    def reveal_choice(self) -> Tuple[int, bytes]:
         """Return the bit and its salt for verification."""
-        return self.selected_bit, self.bit_salt
+        return self.selected_bit, self.salt
 
-    def reveal_message(self) -> Tuple[str, str]:
-        """Return the message and its salt for verification."""
+    def reveal_message(self) -> Tuple[str, bytes]:
+        """Return the message and its separate salt (pre-combined API)."""
         return self.selected_msg, self.msg_salt
 
+# ---------- Timed Input ----------
+def _input_with_timeout(prompt: str, seconds: float) -> str:
+    """
+    Like input(), but raise TimeoutError if no line arrives within `seconds`.
+
+    All reads go through sys.stdin, the same reader input() uses elsewhere
+    in the CLI, so no input is lost between the two. The timeout only
+    applies to an interactive terminal: there a canonical-mode read returns
+    one line at a time, so select() on the descriptor (a kbhit() poll on
+    Windows consoles) reliably tells whether a line is waiting. Piped or
+    redirected stdin is read with plain input().
+    """
+    if not sys.stdin.isatty():
+        return input(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    if msvcrt is not None:
+        deadline = time.monotonic() + seconds
+        while not msvcrt.kbhit():
+            if time.monotonic() >= deadline:
+                raise TimeoutError
+            time.sleep(0.05)
+    else:
+        ready, _, _ = select.select([sys.stdin], [], [], seconds)
+        if not ready:
+            raise TimeoutError
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
 # ---------- RoundContext Class ----------
 class RoundContext:
     """
     Manages the commit and reveal phases for two players.
-    Supports timeouts on commit and reveal phases to prevent stalling.
+    Each player's commit input is bounded by TIMEOUT to prevent stalling.
     """
-    TIMEOUT = 30  # seconds per phase
+    TIMEOUT = 30  # seconds per player per phase
 
     def __init__(self, player1: Player, player2: Player):
         self.p1 = player1
         self.p2 = player2
-        self._timer: Optional[threading.Timer] = None
-
-    def _start_timeout(self, phase: str):
-        def on_timeout():
-            print(f"Timeout during {phase} phase. Aborting round.")
-            raise TimeoutError(phase)
-        self._timer = threading.Timer(self.TIMEOUT, on_timeout)
-        self._timer.start()
-
-    def _cancel_timeout(self):
-        if self._timer:
-            self._timer.cancel()
-            self._timer = None
-
-    def commit_phase(self) -> None:
-        """Ask each player to commit their bit under a timeout."""
+
+    def commit_phase(self, require_message: bool=False) -> None:
+        """
+        Ask each player to commit their bit, and optionally a short message,
+        under a timeout.
+
+        Raises:
+            TimeoutError: if a player does not answer within TIMEOUT seconds.
+        """
         for player in (self.p1, self.p2):
-            self._start_timeout('commit')
-            while True:
-                raw = input(f"[{player.name}] Enter choice (yes/no): ").strip().lower()
-                if raw in ('yes','y','1'):
-                    bit = 1
-                elif raw in ('no','n','0'):
-                    bit = 0
-                else:
-                    print("Invalid input. Please enter yes or no.")
-                    continue
-                try:
-                    player.commit_choice(bit)
-                finally:
-                    self._cancel_timeout()
-                break
+            deadline = time.monotonic() + self.TIMEOUT
+            try:
+                while True:
+                    raw = _input_with_timeout(f"[{player.name}] Enter choice (yes/no): ",
+                                              max(0.0, deadline - time.monotonic()))
+                    raw = raw.strip().lower()
+                    if raw in ('yes','y','1'):
+                        bit = 1
+                    elif raw in ('no','n','0'):
+                        bit = 0
+                    else:
+                        print("Invalid input. Please enter yes or no.")
+                        continue
+                    break
+                msg = None
+                if require_message:
+                    msg = _input_with_timeout(f"[{player.name}] Enter a short message (or blank to skip): ",
+                                              max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                raise TimeoutError('commit') from None
+            player.commit_choice(bit, msg or None)  # blank means skip
 
     def reveal_phase(self, require_message: bool=False) -> None:
-        """Reveal and verify commitments under a timeout."""
+        """
+        Reveal and verify each player's commitment. A combined bit+message
+        commitment is checked with a single hash; a message committed
+        separately via Player.commit_message is also verified when
+        `require_message` is set.
+        """
         for player in (self.p1, self.p2):
-            self._start_timeout('reveal')
-            # Verify bit
             bit, salt = player.reveal_choice()
-            try:
-                verify_bit(player.bit_commit, bit, salt)
-                print(f"[{player.name}] bit verify OK.")
-            except IntegrityError as e:
-                self._cancel_timeout()
-                raise
-            # Optionally verify message
+            if player.has_combined_commitment:
+                verify_combined(player.commitment, bit, player.selected_msg, salt)
+                print(f"[{player.name}] bit and message verify OK.")
+                continue
+            verify_bit(player.commitment, bit, salt)
+            print(f"[{player.name}] bit verify OK.")
             if require_message and player.msg_commit:
                 msg, msalt = player.reveal_message()
-                try:
-                    verify_message(player.msg_commit, msg, msalt)
-                    print(f"[{player.name}] message verify OK.")
-                except IntegrityError:
-                    self._cancel_timeout()
-                    raise
-            self._cancel_timeout()
+                verify_message(player.msg_commit, msg, msalt)
+                print(f"[{player.name}] message verify OK.")
 
     def compute_and(self) -> bool:
         """Compute the logical AND of both players' bits."""
@@ -158,51 +245,56 @@ class GameEngine:
         self.player1 = Player(name1)
         self.player2 = Player(name2)
 
-    def play_round(self, require_message: bool=False) -> Dict[str, Optional[str]]:
+    def play_round(self, require_message: bool=False) -> Dict[str, object]:
         """
         Execute a full commit-reveal round:
-          1) commit_phase()
-          2) optional message commitment
-          3) reveal_phase()
-          4) compute_and() and display result
+          1) commit_phase(), with a message per player if required
+          2) reveal_phase()
+          3) compute_and() and display result
 
         Returns a dict with keys:
           'bit_result': bool
           'message1': str or None
           'message2': str or None
+          'aborted': bool, True if the round timed out before both players
+                     committed (nothing was decided, so it should not count)
         """
         clear()
         print("=== New 2PC Round ===")
-        # Commit bits
-        self.p1 = Player(self.player1.name)
-        self.p2 = Player(self.player2.name)
-        context = RoundContext(self.p1, self.p2)
-        context.commit_phase()
-
-        # Optional message
-        if require_message:
-            for player in (context.p1, context.p2):
-                msg = input(f"[{player.name}] Enter a short message (or blank to skip): ")
-                if msg:
-                    player.commit_message(msg)
+        # Commit bits (and messages)
+        self.player1.reset()
+        self.player2.reset()
+        context = RoundContext(self.player1, self.player2)
+        try:
+            context.commit_phase(require_message)
+        except TimeoutError as e:
+            print()  # the unanswered prompt left the cursor mid-line
+            print(_C_WARN, f"Timeout during {e} phase. Aborting round.")
+            return {'bit_result': False, 'message1': None, 'message2': None, 'aborted': True}
 
         # Reveal and verify
         try:
             context.reveal_phase(require_message)
         except IntegrityError:
-            print(Color.WARNING.value, "Integrity error! Round aborted.")
-            return {'bit_result': False, 'message1': None, 'message2': None}
+            print(_C_WARN, "Integrity error! Round aborted.")
+            return {'bit_result': False, 'message1': None, 'message2': None, 'aborted': False}
 
         # Compute AND
         result = context.compute_and()
-        block = Color.GREEN.value if result else Color.PURPLE.value
-        print(f"Result block: {block}")
+        out = getattr(sys.stdout, 'buffer', None)
+        if out is not None:
+            # Pre-encoded line written under the text layer (flushed first to keep order)
+            sys.stdout.flush()
+            out.write(_RESULT_GREEN if result else _RESULT_PURPLE)
+        else:
+            print(f"Result block: {(Color.GREEN if result else Color.PURPLE).value}")
         print("Both chose yes!" if result else "At least one said no.")
 
         return {
             'bit_result': result,
-            'message1': context.p1.selected_msg,
-            'message2': context.p2.selected_msg
+            'message1': context.p1.selected_msg or None,
+            'message2': context.p2.selected_msg or None,
+            'aborted': False
         }
 
 # ---------- Module Exports ----------